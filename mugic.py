@@ -92,23 +92,46 @@ from oscpy.client import OSCClient
 import time
 from time import sleep
 import math
-from math import pi, isclose
+from math import pi, isclose, hypot
+import struct
 from collections import deque
+from operator import itemgetter
 import quaternion.quat as quat
 import quaternion.vector as vec
 import quaternion.graph3d as graph3d
 from array import array
-from threading import Timer, Thread
+from threading import Timer, Thread, Lock, Condition
 import logging
 
 # HELPERS
 def sign(number):
     return -1 if number < 0 else 1 if number > 0 else 0
 
+def bits_to_text_table(labels):
+    """returns a lookup table from every combination of bits to the labels of its set bits"""
+    return tuple([label for bit, label in enumerate(labels) if bits & (1<<bit)]
+                 for bits in range(1<<len(labels)))
+
 def points_are_close(p0, p1, threshold):
     """returns if two points are closer together than a threshold value"""
-    distance = math.sqrt(sum([(v1-v2)**2 for v1,v2 in zip(p0,p1)]))
-    return distance < threshold
+    return math.dist(p0, p1) < threshold
+
+def normalise_quat(w, x, y, z):
+    """normalises quaternion components the same way as quat.Quaternion.normalise"""
+    if w == 1: return (1, 0, 0, 0)
+    magnitude = math.sqrt(w*w + x*x + y*y + z*z)
+    if magnitude < 0.1: return (1, 0, 0, 0)
+    if isclose(magnitude, 1.0, rel_tol=quat.mdelta): return (w, x, y, z)
+    return (w/magnitude, x/magnitude, y/magnitude, z/magnitude)
+
+def nlerp_quat(q1, q2, ratio):
+    """normalised lerp between two (w, x, y, z) quaternions, same as quat.Quaternion.nlerp"""
+    if sum([a*b for a, b in zip(q1, q2)]) < 0: q2 = [-b for b in q2]
+    return normalise_quat(*[a - ratio*(a - b) for a, b in zip(q1, q2)])
+
+def types_to_struct(types):
+    """compiles a list of int/float types into a struct that can coerce values in one call"""
+    return struct.Struct('=' + ''.join('q' if t is int else 'd' for t in types))
 
 #########################################
 #             BASE CLASSES              #
@@ -132,7 +155,13 @@ class IMU:
 
     Attributes:
         _data (deque of dicts): working deque buffer for IMU datagrams
-        _reserve (None or dequeu of dicts): reserve deque for persistent raw datagram storage
+        _pending (deque of tuples): (arrival time, raw values) received but not yet
+            processed into datagrams
+        _received_time (float or None): arrival time of the datagram being processed
+            by _process_pending; None outside of it
+        _new_data (Condition): notified whenever raw values are received
+        _reserve (None or deque of tuples): reserve deque for persistent raw datagram storage;
+            each raw datagram is kept as a fixed-shape row of its values
         _zero (dict): reserve deque for persistent datagram storage
 
     """
@@ -167,6 +196,13 @@ class IMU:
             self._data = deque(maxlen=self.buffer_limit)
         else:
             self._data = deque(maxlen=buffer_size)
+        # raw values are batched here until the datagrams are next read
+        self._pending = deque()
+        self._pending_lock = Lock()
+        self._received_time = None
+        self._new_data = Condition()
+        self._struct = types_to_struct(self.types[:len(self.datagram)])
+        self._get_values = itemgetter(*self.datagram)
         self.zero()
         self._last_datagram_time = 0.0
         self._total_datagrams = 0
@@ -177,19 +213,52 @@ class IMU:
 
     def _parse_datagram(self, *values):
         """constructs a datagram (dict) given a list of raw values"""
-        values = [t(v) for t, v in zip(self.types, values)]
+        try:
+            # round trip through the struct to coerce every value in one call
+            values = self._struct.unpack(self._struct.pack(*values))
+        except struct.error:
+            # wrong number of values, or values which need converting (e.g. strings)
+            values = [t(v) for t, v in zip(self.types, values)]
         datagram = dict(zip(self.datagram, values))
         return datagram
 
     def _add_datagram(self, datagram):
         """pushes the passed in raw datagram onto the data queue"""
         if self._reserve is not None:
-            self._reserve.appendleft(datagram.copy())
+            self._reserve.appendleft(tuple(datagram.values()))
         datagram = self._update_state(datagram)
         datagram['_seq'] = self._total_datagrams
         self._total_datagrams += 1
         self._data.appendleft(datagram)
 
+    def _process_pending(self):
+        """parses and adds all the raw values received since the last call in one batch"""
+        if not self._pending: return
+        with self._pending_lock:
+            pending = self._pending
+            try:
+                while pending:
+                    self._received_time, values = pending.popleft()
+                    self._add_datagram(self._parse_datagram(*values))
+            finally:
+                self._received_time = None
+
+    def waitForDatagram(self, timeout=None):
+        """Blocks until a datagram that hasn't been read yet is received
+
+        Args:
+            timeout (float or None): maximum seconds to wait; waits forever if None
+
+        Returns:
+            True if there is an unread datagram, False if the wait timed out
+        """
+        with self._new_data:
+            return self._new_data.wait_for(self._has_unread, timeout)
+
+    def _has_unread(self):
+        """returns True if there are raw values waiting to be processed"""
+        return len(self._pending) > 0
+
     def peekDatagram(self, raw=False, smooth=3):
         """Returns the next datagram on the deque.
 
@@ -201,13 +270,30 @@ class IMU:
             None if there was no datagram, otherwise a copy of the datagram on the deque
         """
 
+        self._process_pending()
         if len(self._data) == 0: return None
+        # no copies needed here, _smooth only reads the datagrams it is passed
         if not smooth or smooth <= 1:
-            datagrams = [self._data[-1].copy()]
+            datagrams = [self._data[-1]]
         else:
-            datagrams = [self._data[-i-1].copy() for i in range(min(len(self._data), smooth))]
+            datagrams = [self._data[-i-1] for i in range(min(len(self._data), smooth))]
         return self._smooth(datagrams, raw)
 
+    def peekDatagramView(self, raw=False):
+        """Returns the next datagram on the deque without smoothing or copying it
+
+        Args:
+            raw (bool): if True, returns the datagram on the deque itself, which
+                must not be modified. Otherwise returns a zeroed copy of it.
+
+        Returns:
+            None if there was no datagram, otherwise the datagram on the deque
+        """
+        self._process_pending()
+        if len(self._data) == 0: return None
+        if raw: return self._data[-1]
+        return self._calibrate(self._data[-1].copy())
+
     def popDatagram(self, raw=False, smooth=3):
         """Pops and returns the next datagram on the deque
 
@@ -222,13 +308,12 @@ class IMU:
             None if there was no datagram, otherwise a copy of the popped datagram
         """
 
+        self._process_pending()
         if len(self._data) == 0: return None
         datagrams = [self._data.pop()]
         if not smooth or smooth <= 1:
             return self._smooth(datagrams, raw)
-        for i in range(smooth):
-            if i+1 > len(self._data): break
-            datagrams.append(self._data[-i-1])
+        datagrams += [self._data[-i-1] for i in range(min(len(self._data), smooth))]
         return self._smooth(datagrams, raw)
 
     def popDatagrams(self, raw=False):
@@ -241,10 +326,13 @@ class IMU:
             a list of each of the datagrams
         """
 
-        datagrams = self._data.copy()
-        self._data.clear()
+        self._process_pending()
+        # swap in an empty deque rather than copying and clearing this one
+        with self._pending_lock:
+            datagrams = self._data
+            self._data = deque(maxlen=datagrams.maxlen)
         if raw: return list(datagrams)
-        return [self._calibrate(d) for d in datagrams]
+        return self._calibrate_datagrams(datagrams)
 
     def refresh(self):
         """Removes all but the most recent datagram from the data queue.
@@ -252,6 +340,7 @@ class IMU:
         Returns:
             None if there were no datagrams, else the most recent datagram
         """
+        self._process_pending()
         if len(self._data) == 0: return None
         last_datagram = self._data[0]
         self._data.clear()
@@ -267,14 +356,15 @@ class IMU:
             *args: list of values corresponding to datagram values
             *kwargs: items to update the zero values to
         """
-        self._zero = dict()
-        for key in IMU.datagram:
-            self._zero[key] = 0
+        self._zero = dict.fromkeys(IMU.datagram, 0)
         self._zero['QW'] = 1
-        if len(args) != 0:
-            for key, arg in zip(self.datagram, args):
-                self._zero[key] = arg
+        self._zero.update(zip(self.datagram, args))
         self._zero.update(kwargs)
+        # cache the inverse of the zero quaternion for _calibrate
+        w, x, y, z = IMU._quat_values(self._zero)
+        norm = w*w + x*x + y*y + z*z
+        self._zero_inverse = (w/norm, -x/norm, -y/norm, -z/norm)
+        self._zero_is_identity = self._zero_inverse == (1, 0, 0, 0)
 
     def calibrate(self, *args, **kwargs):
         """Updates the zero values of the IMU; ignores certain values"""
@@ -292,26 +382,41 @@ class IMU:
 
     def _calibrate(self, datagram):
         """Uses the zero values of the IMU to zero/calibrate a datagram"""
-        calibrated_quat = (IMU.to_quaternion(self._zero).inverse()
-                           * IMU.to_quaternion(datagram)).normalise()
-        for key, value in self._zero.items():
-            datagram[key] -= value
-        datagram['QW'] = calibrated_quat.w
-        datagram['QX'] = calibrated_quat.x
-        datagram['QY'] = calibrated_quat.y
-        datagram['QZ'] = calibrated_quat.z
-        datagram['EX'] = (datagram['EX'] + 360) % 360
-        datagram['EY'] = (datagram['EY'] + 360) % 360
-        datagram['EZ'] = (datagram['EZ'] + 360) % 360
+        self._calibrate_datagrams((datagram,))
         return datagram
 
+    def _calibrate_datagrams(self, datagrams):
+        """Zeroes/calibrates each of the datagrams in place; returns them as a list"""
+        zw, zx, zy, zz = self._zero_inverse
+        identity = self._zero_is_identity
+        # subtracting zeros changes nothing, so those are skipped
+        zero_items = [(key, value) for key, value in self._zero.items() if value]
+        for datagram in datagrams:
+            if datagram['QW'] == 0: qw, qx, qy, qz = 1, 0, 0, 0
+            else: qw, qx, qy, qz = datagram['QW'], datagram['QX'], datagram['QY'], datagram['QZ']
+            if identity: w, x, y, z = qw, qx, qy, qz
+            else:
+                # hamilton product of the zero inverse and the datagram quaternion
+                w = zw*qw - zx*qx - zy*qy - zz*qz
+                x = zw*qx + zx*qw + zy*qz - zz*qy
+                y = zw*qy - zx*qz + zy*qw + zz*qx
+                z = zw*qz + zx*qy - zy*qx + zz*qw
+            for key, value in zero_items:
+                datagram[key] -= value
+            datagram['QW'], datagram['QX'], datagram['QY'], datagram['QZ'] = \
+                    normalise_quat(w, x, y, z)
+            datagram['EX'] = (datagram['EX'] + 360) % 360
+            datagram['EY'] = (datagram['EY'] + 360) % 360
+            datagram['EZ'] = (datagram['EZ'] + 360) % 360
+        return list(datagrams)
+
     # returns smoothed datagram via moving average
     # might want to look into madgwick/kalman filter in the future?
     def _smooth(self, datagrams, raw=False):
         """Returns a smoothed datagram using moving average
 
         Args:
-            datagrams (list): list of datagrams to smooth
+            datagrams (list): list of datagrams to smooth; these are not modified
             raw (bool): if True, won't calibrate datagrams
 
         Returns:
@@ -322,16 +427,13 @@ class IMU:
             if raw: return datagrams[0].copy()
             return self._calibrate(datagrams[0].copy())
         smoothed_datagram = datagrams[0].copy()
-        for datagram in datagrams[1:]:
-            for value in self.__class__.datagram:
-                smoothed_datagram[value] += datagram[value]
-        for value in self.__class__.datagram:
-            smoothed_datagram[value] /= len(datagrams)
-        norm_quat = IMU.to_quaternion(smoothed_datagram).normalise()
-        smoothed_datagram['QW'] = norm_quat.w
-        smoothed_datagram['QX'] = norm_quat.x
-        smoothed_datagram['QY'] = norm_quat.y
-        smoothed_datagram['QZ'] = norm_quat.z
+        # sum each datagram value across all the datagrams in one pass
+        count = len(datagrams)
+        columns = zip(*map(self._get_values, datagrams))
+        smoothed_datagram.update(zip(self.datagram, [sum(c)/count for c in columns]))
+        smoothed_datagram['QW'], smoothed_datagram['QX'], \
+                smoothed_datagram['QY'], smoothed_datagram['QZ'] = \
+                normalise_quat(*IMU._quat_values(smoothed_datagram))
         if raw: return smoothed_datagram
         return self._calibrate(smoothed_datagram)
 
@@ -343,23 +445,27 @@ class IMU:
         return quat.Quaternion(datagram['QW'], datagram['QX'],
                                datagram['QY'], datagram['QZ'])
 
+    @staticmethod
+    def _quat_values(datagram):
+        """returns the datagram's quaternion as a (w, x, y, z) tuple, like to_quaternion"""
+        if datagram['QW'] == 0: return (1, 0, 0, 0)
+        return (datagram['QW'], datagram['QX'], datagram['QY'], datagram['QZ'])
+
     @staticmethod
     def _datagram_to_string(datagram):
-        """Transforms a datagram to a simple comma separated string"""
-        data_string = ",".join([str(v) for v in datagram.values()])
+        """Transforms a datagram (or a row of its values) to a simple comma separated string"""
+        values = datagram.values() if isinstance(datagram, dict) else datagram
+        data_string = ",".join(map(str, values))
         return data_string
 
     @staticmethod
     def lerp(d1, d2, ratio=0.5):
         """lerps between two datagrams"""
-        lerped_datagram = d1.copy()
-        for val in d1.keys():
-            lerped_datagram[val] = d1[val] + ratio*(d1[val]- d2[val])
-        lerped_quat = IMU.to_quaternion(d1).nlerp(IMU.to_quaternion(d2), ratio)
-        lerped_datagram['QW'] = lerped_quat.w
-        lerped_datagram['QX'] = lerped_quat.x
-        lerped_datagram['QY'] = lerped_quat.y
-        lerped_datagram['QZ'] = lerped_quat.z
+        lerped_datagram = {key: value + ratio*(d2[key] - value)
+                           for key, value in d1.items()}
+        lerped_datagram['QW'], lerped_datagram['QX'], \
+                lerped_datagram['QY'], lerped_datagram['QZ'] = \
+                nlerp_quat(IMU._quat_values(d1), IMU._quat_values(d2), ratio)
         return lerped_datagram
 
     @staticmethod
@@ -374,6 +480,20 @@ class IMU:
         if datagram is None: return None
         return vec.Vector(datagram['AX'], datagram['AY'], datagram['AZ'])
 
+    def _absolute(self, x, y, z, datagram, raw=False):
+        """rotates a relative (x, y, z) reading of the datagram by its quaternion
+
+        Same as Vector(x, y, z) @ zero_heading @ quat_rot, written out on floats
+        since this runs for every incoming datagram (through _update_frame).
+        """
+        if not raw:
+            # aligns the reading to zero heading (a rotation about z)
+            heading = pi/180 * self._zero['EX']
+            c, s = math.cos(heading), math.sin(heading)
+            x, y = c*x - s*y, s*x + c*y
+        rotation = graph3d.rotation_matrix(IMU._quat_values(datagram))
+        return vec.Vector(*[r[0]*x + r[1]*y + r[2]*z for r in rotation])
+
     def absoluteAccel(self, datagram, raw=False):
         """calculates the absolute accelerometer data from the datagram
 
@@ -382,13 +502,8 @@ class IMU:
             raw (bool): if True, will not zero datagram values to zero heading
         """
         if datagram is None: return None
-        quat_rot = IMU.to_quaternion(datagram)
-        accel = IMU.accel(datagram)
-        if not raw:
-            # aligns the absolute accelerometer data to zero heading
-            zero_heading = quat.Rotator(pi/180 * self._zero['EX'], 0, 0, 1)
-            accel @= zero_heading
-        return vec.Vector(*(accel @ quat_rot).xyz)
+        return self._absolute(datagram['AX'], datagram['AY'], datagram['AZ'],
+                              datagram, raw)
 
     @staticmethod
     def gyro(datagram):
@@ -404,12 +519,8 @@ class IMU:
             raw (bool): if True, will not zero datagram values to zero heading
         """
         if datagram is None: return None
-        quat_rot = IMU.to_quaternion(datagram)
-        gyro = IMU.gyro(datagram)
-        if not raw:
-            zero_heading = quat.Rotator(pi/180 * self._zero['EX'], 0, 0, 1)
-            gyro @= zero_heading
-        return vec.Vector(*(gyro @ quat_rot).xyz)
+        return self._absolute(datagram['GX'], datagram['GY'], datagram['GZ'],
+                              datagram, raw)
 
     @staticmethod
     def mag(datagram):
@@ -432,9 +543,10 @@ class IMU:
     def _pointing_at(self, datagram):
         """converts the IMU's quaternion orientation to what point it is facing on a unit sphere"""
         if datagram is None: return (0, 0, 0)
-        data_quat = IMU.to_quaternion(datagram).normalise()
-        unit_vector = quat.Vector(*self.orientation) @ data_quat
-        return vec.Vector(*unit_vector.xyz)
+        # rotates the orientation by the normalised quaternion with its matrix
+        rotation = graph3d.rotation_matrix(normalise_quat(*IMU._quat_values(datagram)))
+        x, y, z = self.orientation
+        return vec.Vector(*[r[0]*x + r[1]*y + r[2]*z for r in rotation])
 
     def pointingAt(self, datagram=None):
         """returns where the IMU is pointing at on a unit sphere
@@ -461,6 +573,10 @@ class IMUController(IMU):
         _accel_delta (int): assumed max acceleration noise between each datagram
         _accel_low_pass (array('f', [int]*3)): accelerometer upper/lower limit for each axis
         _max_frame_size (int): assumed maximum duration of each movement frame in seconds
+        _gyro_axes (tuple): gyroscope datagram keys, indexed by axis
+        _euler_axes (tuple): euler datagram keys, indexed by axis
+        _moving_text, _rotating_text, _facings_text, _pointing_text (tuple):
+            text lookup tables for the bits returned by the combination functions
 
     """
 
@@ -469,6 +585,14 @@ class IMUController(IMU):
     _accel_delta = 2
     _accel_low_pass = array('f', [3, 5, 5])
     _max_frame_size = 2
+    # datagram keys for each axis, so axis queries are a single index
+    _gyro_axes = ('GX', 'GY', 'GZ')
+    _euler_axes = ('EX', 'EY', 'EZ')
+    # text for each combination of bits from the combination functions
+    _moving_text = bits_to_text_table(("UP", "DN", "RT", "LT", "FW", "BW"))
+    _rotating_text = bits_to_text_table(("UP", "DN", "RT", "LT", "TR", "TL"))
+    _facings_text = bits_to_text_table(("RT", "LT", "FW", "BW"))
+    _pointing_text = bits_to_text_table(("UP", "DN", "RT", "LT", "FW", "BW"))
 
     # bits for interpretation
     UP = 0b1
@@ -509,6 +633,9 @@ class IMUController(IMU):
              * more consistent results
 
         At time of writing, the frame movement data is only gets direction right about half the time.
+
+        Frame durations are measured with _received_time (when the datagram arrived) if set,
+        otherwise with the current time.
         """
         # saves accelerometer max and min values
         accel = self.absoluteAccel(datagram)
@@ -518,40 +645,54 @@ class IMUController(IMU):
         accel_derivative_long = (accel_derivative + self._last_accel_derivative)/2
         self._last_accel_derivative = accel_derivative
         self._last_accel = accel
+        # datagrams are processed in batches, so time them by when they arrived
+        now = time.time() if self._received_time is None else self._received_time
+        min_component = accel_magnitude / 9
         for i in range(3):
+            accel_i = accel[i]
+            abs_accel_i = abs(accel_i)
             # skip edge if value is negligible
-            if abs(accel[i]) < self._accel_low_pass[i]:
+            if abs_accel_i < self._accel_low_pass[i]:
                 continue
             # skip if not a major component of the motion
-            if abs(accel[i]) < accel_magnitude / 9:
+            if abs_accel_i < min_component:
                 continue
             # reset rising/falling if expired or start of a new edge
-            if (time.time()-self._last_frame_update > self._max_frame_size or
+            if (now-self._last_frame_update > self._max_frame_size or
                 not (self._rising_accel[i] == 0 or self._falling_accel[i] == 0)):
                 self._rising_accel[i] = 0
                 self._falling_accel[i] = 0
-                self._last_frame_update = time.time()
+                self._last_frame_update = now
             # skip if value is not a peak/valley
             if not (isclose(accel_derivative[i], 0, abs_tol=self._accel_delta) or
                     isclose(accel_derivative_long[i], 0, abs_tol=self._accel_delta)):
                 continue
             # update rising and falling accel values
             if self._rising_accel[i] == 0:
-                self._rising_accel[i] = accel[i]
-                self._last_frame_update = time.time()
+                self._rising_accel[i] = accel_i
+                self._last_frame_update = now
             elif self._falling_accel[i] == 0:
                 # skip if value is in the same direction as rising, or just too close
-                if sign(accel[i]) == sign(self._rising_accel[i]):
+                if sign(accel_i) == sign(self._rising_accel[i]):
                     continue
-                if isclose(accel[i], self._rising_accel[i], abs_tol=self._accel_low_pass[i]):
+                if isclose(accel_i, self._rising_accel[i], abs_tol=self._accel_low_pass[i]):
                     continue
-                self._falling_accel[i] = accel[i]
-                self._last_accel_frame[i] = (self._rising_accel[i], time.time()-self._last_frame_update)
+                self._falling_accel[i] = accel_i
+                self._last_accel_frame[i] = (self._rising_accel[i], now-self._last_frame_update)
 
     def _callback(self, *values):
-        """callback method used when receiving a datagram from the IMU"""
-        datagram = self._parse_datagram(*values)
-        super()._add_datagram(datagram)
+        """callback method used when receiving a datagram from the IMU
+
+        The raw values are only queued here, along with when they arrived;
+        parsing and processing are done in a batch by _process_pending the
+        next time the datagrams are read, or once a full buffer's worth of
+        values is waiting.
+        """
+        self._pending.append((time.time(), values))
+        with self._new_data:
+            self._new_data.notify_all()
+        if len(self._pending) >= self._data.maxlen:
+            self._process_pending()
 
     # called when processing an incoming datagram
     def _update_state(self, datagram):
@@ -560,6 +701,16 @@ class IMUController(IMU):
         self._update_frame(datagram)
         return datagram
 
+    def _has_unread(self):
+        """returns True if there are raw values waiting, or processed datagrams next() hasn't returned
+
+        _callback processes the waiting values itself once a full buffer's worth
+        has arrived, so unread datagrams can already be on the deque.
+        """
+        if super()._has_unread(): return True
+        data = self._data
+        return len(data) > 0 and self.newer(data[-1], self._last_datagram)
+
     def newer(self, datagram, last_datagram):
         """compares two datagrams and returns True if the first is newer
 
@@ -587,12 +738,16 @@ class IMUController(IMU):
         Returns:
             The next datagram on the deque, or None if unavailable.
         """
+        self._process_pending()
+        if len(self._data) == 0: return self._last_datagram
+        # nothing new since the last call, skip smoothing and calibrating again
+        if not self.newer(self._data[-1], self._last_datagram):
+            return self._last_datagram.copy()
         next_datagram = self.peekDatagram(raw=raw, smooth=smooth)
-        if next_datagram is None: return self._last_datagram
         # check if the next datagram is new
         if self.newer(next_datagram, self._last_datagram):
             self._last_datagram = next_datagram
-            self._last_datagram_time = time.time()
+            self._last_datagram_time = time.monotonic()
         return self._last_datagram.copy()
 
     @property
@@ -616,7 +771,7 @@ class IMUController(IMU):
     def connected(self):
         """queries and returns connection status"""
         _ = self.next()
-        if time.time() - self._last_datagram_time > self._connection_timeout:
+        if time.monotonic() - self._last_datagram_time > self._connection_timeout:
             self._last_datagram = None
             self.popDatagrams()
             return False
@@ -624,6 +779,7 @@ class IMUController(IMU):
 
     def calibrate(self, *args, **kwargs):
         """zeroes using passed in args OR the next datagram and resets the movement frame"""
+        self._process_pending()
         if len(self._data) != 0 and len(args) == 0:
             next_datagram = self.peekDatagram(raw=True)
             if next_datagram is None: return
@@ -670,7 +826,7 @@ class IMUController(IMU):
 
         if datagram is None: datagram = self.next()
         if datagram is None: return False
-        axis = 'GX' if axis == 0 else 'GY' if axis == 1 else 'GZ'
+        axis = self._gyro_axes[axis]
         if datagram[axis] * direction > threshold:
             return True
         return False
@@ -690,16 +846,13 @@ class IMUController(IMU):
 
         if datagram is None:
             datagram = self.next()
-        direction = (360 + direction%360) % 360
         if datagram is None: return False
-        axis = 'EX' if axis == 0 else 'EY' if axis == 1 else 'EZ'
-        angle = (int(datagram[axis]) + 360) % 360
+        axis = self._euler_axes[axis]
         # angle = quat.euler(IMU.to_quaternion(datagram))[axis] * 180
-        left  = (direction + 360 - threshold) % 360
-        right = (direction + threshold) % 360
-        if left > right:
-            return left <= angle or angle <= right
-        return angle >= left and angle <= right
+        # signed difference from the target angle in [-180, 180), so the
+        # 0/360 wrap needs no special case
+        difference = (int(datagram[axis]) - direction + 540) % 360 - 180
+        return abs(difference) <= threshold
 
     def _pointing(self, point, threshold=0.70, datagram=None, pointing_at=None):
         """returns if the IMU is pointing towards a given point on a unit sphere
@@ -771,8 +924,8 @@ class IMUController(IMU):
         if datagram is None:
             datagram = self.next()
             if datagram is None: return False
-        if abs(self.accel(datagram)) > threshold: return True
-        return False
+        # magnitude in one call, without building a Vector
+        return hypot(datagram['AX'], datagram['AY'], datagram['AZ']) > threshold
 
     # combination functions
     def moving(self, *args, text=False, **kwargs):
@@ -804,18 +957,10 @@ class IMUController(IMU):
             return self._moving_to_text(moving_bits)
         return moving_bits
 
-    @staticmethod
-    def _moving_to_text(moving_bits):
+    @classmethod
+    def _moving_to_text(cls, moving_bits):
         """Converts a set of bits from the moving function to a list of strings"""
-
-        text = list()
-        if moving_bits & (1<<0): text.append("UP")
-        if moving_bits & (1<<1): text.append("DN")
-        if moving_bits & (1<<2): text.append("RT")
-        if moving_bits & (1<<3): text.append("LT")
-        if moving_bits & (1<<4): text.append("FW")
-        if moving_bits & (1<<5): text.append("BW")
-        return text
+        return list(cls._moving_text[moving_bits & (len(cls._moving_text) - 1)])
 
 
     def rotating(self, text=False, **kwargs):
@@ -847,17 +992,10 @@ class IMUController(IMU):
             return self._rotating_to_text(rotating_bits)
         return rotating_bits
 
-    @staticmethod
-    def _rotating_to_text(rotating_bits):
+    @classmethod
+    def _rotating_to_text(cls, rotating_bits):
         """Converts a set of bits from the rotating function to a list of strings"""
-        text = list()
-        if rotating_bits & (1<<0): text.append("UP")
-        if rotating_bits & (1<<1): text.append("DN")
-        if rotating_bits & (1<<2): text.append("RT")
-        if rotating_bits & (1<<3): text.append("LT")
-        if rotating_bits & (1<<4): text.append("TR")
-        if rotating_bits & (1<<5): text.append("TL")
-        return text
+        return list(cls._rotating_text[rotating_bits & (len(cls._rotating_text) - 1)])
 
 
     def pitched(self, text=False, **kwargs):
@@ -941,15 +1079,10 @@ class IMUController(IMU):
             return self._facings_to_text(rolling_bits)
         return rolling_bits
 
-    @staticmethod
-    def _facings_to_text(facing_bits):
+    @classmethod
+    def _facings_to_text(cls, facing_bits):
         """converts facing bits (pitched, yawed, rolled) into a list of strings"""
-        text = list()
-        if facing_bits & (1<<0): text.append("RT")
-        if facing_bits & (1<<1): text.append("LT")
-        if facing_bits & (1<<2): text.append("FW")
-        if facing_bits & (1<<3): text.append("BW")
-        return text
+        return list(cls._facings_text[facing_bits & (len(cls._facings_text) - 1)])
 
     # returns which quadrant is being pointed at
     def pointing(self, text=False, **kwargs):
@@ -982,17 +1115,10 @@ class IMUController(IMU):
             return self._pointing_to_text(pointing_bits)
         return pointing_bits
 
-    @staticmethod
-    def _pointing_to_text(pointing_bits):
+    @classmethod
+    def _pointing_to_text(cls, pointing_bits):
         """converts bits from pointing method to list of strings"""
-        text = list()
-        if pointing_bits & (1<<0): text.append("UP")
-        if pointing_bits & (1<<1): text.append("DN")
-        if pointing_bits & (1<<2): text.append("RT")
-        if pointing_bits & (1<<3): text.append("LT")
-        if pointing_bits & (1<<4): text.append("FW")
-        if pointing_bits & (1<<5): text.append("BW")
-        return text
+        return list(cls._pointing_text[pointing_bits & (len(cls._pointing_text) - 1)])
 
     def thrustAccel(self, datagram=None):
         """returns the acceleration of the datagram in the axis of pointing"""
@@ -1116,11 +1242,14 @@ class MugicDevice(IMUController):
             datagram['QZ'], datagram['QX'] = -datagram['QZ'], -datagram['QX']
             datagram['EY'] = -datagram['EY']
         if not self.legacy: # Mugic 2.0 - accel has gravity
-            quat_rot = IMU.to_quaternion(datagram)
-            accel = quat.Vector(
-                datagram['AX'], datagram['AY'], datagram['AZ'])
-            accel -= (quat.Vector(0, 0, self.GRAVITY) @ quat_rot.inverse())
-            datagram['AX'], datagram['AY'], datagram['AZ'] = accel.xyz
+            # subtracts Vector(0, 0, GRAVITY) @ quat_rot.inverse(), written out
+            # on the quaternion's values so no Quaternion/Vector objects are built
+            w, x, y, z = IMU._quat_values(datagram)
+            norm = w*w + x*x + y*y + z*z
+            gravity = self.GRAVITY / (norm*norm)
+            datagram['AX'] -= 2*(x*z - w*y) * gravity
+            datagram['AY'] -= 2*(y*z + w*x) * gravity
+            datagram['AZ'] -= (w*w - x*x - y*y + z*z) * gravity
             datagram['EZ'] = -datagram['EZ']
         datagram = super()._update_state(datagram)
         return datagram
@@ -1143,7 +1272,7 @@ class MugicDevice(IMUController):
         """
 
         if not self.connected(): return
-        md = self.next()
+        md = self.peekDatagramView(raw=True)
         if md is None: return
         # Mugic 1.0 has a crazy high mV value
         if md['mV'] > 100 and not self.legacy: self.toggleLegacy()
@@ -1265,9 +1394,14 @@ class MockMugicDevice(MugicDevice):
     def sendData(self, datafile):
         logging.info(f"{self}: sending data in file {datafile}")
         self._last_sent_time = 0
-        for data in open(datafile, 'r'):
-            values = [t(v) for t, v in zip(MugicDevice.types,
-                                           data.split(','))]
+        # parse the whole file in one go so the send loop only has to send;
+        # each column is converted with a single map over its type
+        with open(datafile, 'r') as file:
+            columns = zip(*[line.split(',') for line in file])
+            rows = list(zip(*[map(t, column)
+                              for t, column in zip(MugicDevice.types, columns)]))
+        ms = MugicDevice.datagram.index('ms')
+        for values in rows:
             if self.port is None:
                 self._callback(*values)
             else:
@@ -1275,17 +1409,16 @@ class MockMugicDevice(MugicDevice):
             if self._send_thread_exit_flag:
                 logging.warning(f"{self}: aborted sending {datafile}")
                 return
-            data = self._parse_datagram(*values)
             if self._last_sent_time == 0:
                 sleep(0.1)
-                self._last_sent_time = data["ms"]
+                self._last_sent_time = values[ms]
                 continue
             else:
                 # mugic returns time in milliseconds
-                delay = (data["ms"] - self._last_sent_time) / 1000
+                delay = (values[ms] - self._last_sent_time) / 1000
                 if delay > 1: sleep(0.02)
                 else: sleep(delay)
-            self._last_sent_time = data["ms"]
+            self._last_sent_time = values[ms]
         logging.info(f"{self}: completed sending {datafile}")
 
     def __str__(self):
@@ -1322,14 +1455,9 @@ def recordMugicDevice(port, datafile, seconds=60, timeout=60):
     """
     mugic = MugicDevice(port=port, buffer_size=None)
     logging.info("waiting for mugic to be connected...")
-    total_wait_time = 0
-    wait_period = 0.1
-    while not mugic.connected():
-        sleep(wait_period)
-        total_wait_time += wait_period
-        if total_wait_time > timeout:
-            logging.error("aborting... waited too long!")
-            return
+    if not mugic.waitForDatagram(timeout) or not mugic.connected():
+        logging.error("aborting... waited too long!")
+        return
     logging.info(f"Recording {mugic} for the next {seconds} seconds...")
     file = open(datafile, "w")
     recordTimer = Timer(
@@ -1341,11 +1469,10 @@ def recordMugicDevice(port, datafile, seconds=60, timeout=60):
 
 def _write_mugic_recorded_data(mugic, file):
     """writes the data in a mugic device to a file"""
+    mugic._process_pending()
     store = mugic._reserve if mugic._reserve is not None else mugic._data
     logging.info(f"preparing to write {len(store)} datagrams...")
-    for datagram in reversed(list(store)):
-        datagram = MugicDevice._datagram_to_string(datagram)
-        # print("writing datagram:", datagram)
-        file.write(datagram+'\n')
+    lines = map(MugicDevice._datagram_to_string, reversed(list(store)))
+    file.writelines([line + '\n' for line in lines])
     logging.info("Recording complete")
     file.close()
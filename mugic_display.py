@@ -1,13 +1,20 @@
 """mugic_display.py - module used for displaying the mugic and all its data"""
 from mugic import *
+from operator import itemgetter
+from bisect import bisect_right
 import argparse
 import pygame
 from pygame_helpers import Window, WindowScreen, TextSprite, Color, MONOSPACE
 
 def _log_scale(number):
-    return (math.log(abs(number)+1)/3.0) * sign(number)
+    return math.copysign(math.log1p(abs(number))/3.0, number)
 
 class IMUControllerDisplay:
+    # datagram values drawn by getImage, and how much they must change to redraw
+    _image_keys = ('QW', 'QX', 'QY', 'QZ', 'AX', 'AY', 'AZ',
+                   'GX', 'GY', 'GZ', 'MX', 'MY', 'MZ')
+    _image_tolerance = 1e-4
+
     def __init__(self, imu, w=100, h=100):
         self._imu = imu
         self._init_text()
@@ -18,6 +25,7 @@ class IMUControllerDisplay:
         self._image = pygame.Surface(self._image_size)
         self._image.convert_alpha()
         self._image.set_colorkey(Color.black)
+        self._last_image_state = None
         self._action_image = self._image.copy()
         self._action_image.set_colorkey(Color.black)
         # draw acceleration and gyroscope graph axes
@@ -118,6 +126,20 @@ class IMUControllerDisplay:
         self._camera["cube"] = self._image_cube
         self._camera["axes"] = self._image_axes
 
+    def _image_changed(self, datagram):
+        """returns if drawing the datagram would change the last image drawn"""
+        if datagram is None: return True
+        state = ([datagram[key] for key in self._image_keys],
+                 tuple(self._camera.crot), self._camera.distance,
+                 self._imu.dimensions)
+        last_state = self._last_image_state
+        if (last_state is not None and state[1:] == last_state[1:] and
+            all(abs(a - b) < self._image_tolerance
+                for a, b in zip(state[0], last_state[0]))):
+            return False
+        self._last_image_state = state
+        return True
+
     def getImage(self, w=None, h=None, datagram=None):
         w, h = self._set_image_size(w, h)
         try:
@@ -126,11 +148,16 @@ class IMUControllerDisplay:
             if hasattr(self, "_image_cube"): raise AttributeError(e)
             self._init_image_objects()
             return self.getImage(w, h)
-        self._image.fill(Color.black)
         # apply datagram transformations
         if datagram is None:
             datagram = self._imu.peekDatagram()
-        if not self._imu.connected():
+        connected = self._imu.connected()
+        # the device is at rest, reuse the last image
+        if connected and not self._image_changed(datagram):
+            return self._image
+        self._image.fill(Color.black)
+        if not connected:
+            self._last_image_state = None
             pygame.draw.circle(self._image,
                                Color.red,
                                (w-w//16, h-h//16),
@@ -149,13 +176,14 @@ class IMUControllerDisplay:
             gyro_data = self._imu.gyro(datagram) / 1080
             #print(quat.euler(data_quat))
             #data_quat = data_quat.normalise()
-            self._camera["accel"] = self._image_accel * accel_data.xyz \
-                    @ data_quat
-            self._camera["gyro"] = self._image_gyro * gyro_data.xyz
-            self._camera["compass"] = self._image_magnet * magnet_data.xyz
-            self._camera["cube"] = self._image_cube * self._imu.dimensions\
-                    @ data_quat
-            self._camera["facing"] = self._image_facing @ data_quat
+            # build the rotation matrix once and share it between the shapes
+            rotation = graph3d.rotation_matrix(data_quat)
+            camera = self._camera
+            camera.update("accel", self._image_accel, accel_data.xyz, rotation)
+            camera.update("gyro", self._image_gyro, gyro_data.xyz)
+            camera.update("compass", self._image_magnet, magnet_data.xyz)
+            camera.update("cube", self._image_cube, self._imu.dimensions, rotation)
+            camera.update("facing", self._image_facing, m=rotation)
         self._camera.show(self._image)
         return self._image
 
@@ -226,10 +254,16 @@ class IMUControllerDisplay:
     def _init_text(self):
         self._text = "No Connection"
         self._action_text = "No Connection"
-        data_labels= [" quat", "euler", "accel",
-                      " gyro", " magn", "frame"]
-        self._data_format_text = '\n'.join(
-                [value+": {}" for value in data_labels])
+        # one printf-style template for the whole data text, filled in a single call
+        data_row = "%6.2f, %6.2f, %6.2f"
+        data_formats = [" quat: %5.2f, %5.2f, %5.2f, %5.2f",
+                        "euler: " + data_row, "accel: " + data_row,
+                        " gyro: " + data_row, " magn: " + data_row,
+                        "frame: %s"]
+        self._data_format_text = '\n'.join(data_formats)
+        self._data_text_values = itemgetter(
+                'QW', 'QX', 'QY', 'QZ', 'EX', 'EY', 'EZ', 'AX', 'AY', 'AZ',
+                'GX', 'GY', 'GZ', 'MX', 'MY', 'MZ', '_seq')
         self._action_format_text = "Moving: {}\nRotating: {}\n"
         self._action_format_text += "Pointing: {:3s}\nYaw {:3s} Pitch {:3s} Roll {:3s}\n"
         self._action_format_text += "Thrust: {:>6.2f}, Swing:{:>6.2f}\n"
@@ -239,16 +273,7 @@ class IMUControllerDisplay:
             md = self._imu.peekDatagram()
         else: md = datagram
         if md is None: return self._text
-        quat = "{:>5.2f}, {:>5.2f}, {:>5.2f}, {:>5.2f}"\
-                .format(md['QW'], md['QX'], md['QY'], md['QZ'])
-        data_row = "{:>6.2f}, {:>6.2f}, {:>6.2f}"
-        euler = data_row.format(md['EX'], md['EY'], md['EZ'])
-        accel = data_row.format(md['AX'], md['AY'], md['AZ'])
-        gyro= data_row.format(md['GX'], md['GY'], md['GZ'])
-        mag = data_row.format(md['MX'], md['MY'], md['MZ'])
-        frame = md['_seq']
-        self._text = self._data_format_text.format(quat, euler, accel, gyro,
-                                                   mag, frame)
+        self._text = self._data_format_text % self._data_text_values(md)
         self._text = str(self._imu) + '\n' + self._text
         return self._text
 
@@ -280,14 +305,24 @@ class IMUControllerDisplay:
         return self.getDataText() + "\n" + self.getActionText()
 
 class MugicDisplay(IMUControllerDisplay):
+    # calibration levels below each bound, and the face shown for them
+    _calib_bounds = (1.0, 2.0, 3.0)
+    _calib_faces = (":(", ":|", ":)", ":D")
+
     def _init_text(self):
         self._text = "No Connection"
         self._action_text = "No Connection"
-        data_labels= [" quat", "euler", "accel",
-                      " gyro", " magn",
-                      "battery", "frame", "calib (SAGM)"]
-        self._data_format_text = '\n'.join(
-                [value+": {}" for value in data_labels])
+        data_row = "%6.2f, %6.2f, %6.2f"
+        data_formats = [" quat: %5.2f, %5.2f, %5.2f, %5.2f",
+                        "euler: " + data_row, "accel: " + data_row,
+                        " gyro: " + data_row, " magn: " + data_row,
+                        "battery: %5.2f %smV", "frame: %s", "calib (SAGM): %s"]
+        self._data_format_text = '\n'.join(data_formats)
+        self._data_text_values = itemgetter(
+                'QW', 'QX', 'QY', 'QZ', 'EX', 'EY', 'EZ', 'AX', 'AY', 'AZ',
+                'GX', 'GY', 'GZ', 'MX', 'MY', 'MZ', 'Battery', 'mV', 'seqnum')
+        self._calib_values = itemgetter(
+                'calib_sys', 'calib_accel', 'calib_gyro', 'calib_mag')
         self._action_format_text = "Moving: {}\nRotating: {}\n"
         self._action_format_text += "Pointing: {:3s}\nYaw {:3s} Pitch {:3s} Roll {:3s}\n"
         self._action_format_text += "Thrust: {:>6.2f}, Swing:{:>6.2f}\n"
@@ -297,21 +332,11 @@ class MugicDisplay(IMUControllerDisplay):
             md = self._imu.peekDatagram()
         else: md = datagram
         if md is None: return self._text
-        quat = "{:>5.2f}, {:>5.2f}, {:>5.2f}, {:>5.2f}"\
-                .format(md['QW'], md['QX'], md['QY'], md['QZ'])
-        data_row = "{:>6.2f}, {:>6.2f}, {:>6.2f}"
-        euler = data_row.format(md['EX'], md['EY'], md['EZ'])
-        accel = data_row.format(md['AX'], md['AY'], md['AZ'])
-        gyro= data_row.format(md['GX'], md['GY'], md['GZ'])
-        mag = data_row.format(md['MX'], md['MY'], md['MZ'])
-        battery_and_mv = "{:5.2f} {}mV".format(
-                md['Battery'], md['mV'])
-        frame = md['seqnum']
         calib_status = " & ".join(
-                [":(" if md[c] < 1.0 else ":|" if md[c] < 2.0 else ":)" if md[c] < 3.0 else ":D"
-                 for c in ['calib_sys', 'calib_accel', 'calib_gyro', 'calib_mag']])
-        self._text = self._data_format_text.format(quat, euler, accel, gyro,
-                                                   mag, battery_and_mv, frame, calib_status)
+                [self._calib_faces[bisect_right(self._calib_bounds, calib)]
+                 for calib in self._calib_values(md)])
+        self._text = self._data_format_text % (self._data_text_values(md)
+                                               + (calib_status,))
         self._text = str(self._imu) + '\n' + self._text
         return self._text
 
@@ -365,52 +390,67 @@ def viewMugicDevice(mugic_device):
     # variables
     last_datagram = None
     fps_value = 0
+    image_scale = 1
+    fps_text_ticks = ticks
+    pressed = set() # keys currently held down
     # main loop
     while True:
-        event = pygame.event.poll()
-        if (event.type == pygame.QUIT or
-            (event.type == pygame.KEYDOWN
-             and event.key == pygame.K_ESCAPE)):
-            Window().quit()
-            break
-        elif event.type == pygame.VIDEORESIZE:
-            Window()._resize_window(event.w, event.h)
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_f:
-                mugic_data_text.toggleVisibility()
-            elif event.key == pygame.K_g:
-                mugic_movement_text.toggleVisibility()
-            elif event.key == pygame.K_l:
-                mugic_device.toggleLegacy()
-            elif event.key in (pygame.K_h, pygame.K_i):
-                instruction_text.toggleVisibility()
-        state = pygame.key.get_pressed()
+        text_toggled = False
+        quitting = False
+        # handle every queued event, since the loop may wait for data below
+        for event in pygame.event.get():
+            if (event.type == pygame.QUIT or
+                (event.type == pygame.KEYDOWN
+                 and event.key == pygame.K_ESCAPE)):
+                Window().quit()
+                quitting = True
+                break
+            elif event.type == pygame.VIDEORESIZE:
+                Window()._resize_window(event.w, event.h)
+            elif event.type == pygame.KEYUP:
+                pressed.discard(event.key)
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                pressed.clear()
+            elif event.type == pygame.KEYDOWN:
+                pressed.add(event.key)
+                if event.key == pygame.K_f:
+                    mugic_data_text.toggleVisibility()
+                    text_toggled = True
+                elif event.key == pygame.K_g:
+                    mugic_movement_text.toggleVisibility()
+                    text_toggled = True
+                elif event.key == pygame.K_l:
+                    mugic_device.toggleLegacy()
+                elif event.key in (pygame.K_h, pygame.K_i):
+                    instruction_text.toggleVisibility()
+        if quitting: break
         rot_amount = pi/90
-        if state[pygame.K_a]:
+        if pygame.K_a in pressed:
             mugic_display.rotateImageX(-rot_amount)
-        elif state[pygame.K_d]:
+        elif pygame.K_d in pressed:
             mugic_display.rotateImageX(rot_amount)
-        if state[pygame.K_w]:
+        if pygame.K_w in pressed:
             mugic_display.rotateImageY(-rot_amount)
-        elif state[pygame.K_s]:
+        elif pygame.K_s in pressed:
             mugic_display.rotateImageY(rot_amount)
-        if state[pygame.K_q]:
+        if pygame.K_q in pressed:
             mugic_display.rotateImageZ(-rot_amount)
-        elif state[pygame.K_e]:
+        elif pygame.K_e in pressed:
             mugic_display.rotateImageZ(rot_amount)
-        elif state[pygame.K_z]:
+        elif pygame.K_z in pressed:
             mugic_display.zoomImage(0.1)
-        elif state[pygame.K_x]:
+        elif pygame.K_x in pressed:
             mugic_display.zoomImage(-0.1)
-        elif state[pygame.K_r]:
+        elif pygame.K_r in pressed:
             mugic_display.resetImage()
-        elif state[pygame.K_c]:
+        elif pygame.K_c in pressed:
             mugic_device.calibrate()
             frames = 0
             ticks = pygame.time.get_ticks() - 1
 
         next_datagram = mugic_device.next(raw=False)
-        if mugic_device.newer(next_datagram, last_datagram):
+        new_datagram = mugic_device.newer(next_datagram, last_datagram)
+        if new_datagram:
             last_datagram = next_datagram
             frames += 1
             fps_value = ((frames*1000)/(pygame.time.get_ticks()-ticks))
@@ -420,29 +460,35 @@ def viewMugicDevice(mugic_device):
         # fill screen with black
         pygame.display.get_surface().fill(Color.black)
 
-        # draw mugic text
-        if mugic_data_text.visible:
-            mugic_data_text.setText(mugic_display.getDataText(next_datagram))
-        if mugic_movement_text.visible:
-            mugic_movement_text.setText(mugic_display.getActionText(next_datagram))
-
-        # draw mugic images
+        # draw mugic text; only rerendered when there is something new to show
+        if new_datagram or text_toggled:
+            if mugic_data_text.visible:
+                mugic_data_text.setText(mugic_display.getDataText(next_datagram))
+            if mugic_movement_text.visible:
+                mugic_movement_text.setText(mugic_display.getActionText(next_datagram))
+
+        # draw mugic images at the window's scale, so they never need rescaling
+        if display_screen._scale != image_scale:
+            image_scale = display_screen._scale
+            mugic_display.setImageSize(int(pane_size[0]*image_scale),
+                                       int(pane_size[1]*image_scale))
         mugic_image = mugic_display.getImage(datagram=next_datagram)
-        mugic_image = pygame.transform.smoothscale_by(mugic_image,
-                                             display_screen._scale)
         action_image = mugic_display.getActionImage(datagram=next_datagram)
-        action_image = pygame.transform.smoothscale_by(action_image,
-                                             display_screen._scale)
         display.blit(action_image, (500*display_screen._scale, 0))
         display.blit(mugic_image, (0, 0))
-        fps_text.setText(round(fps_value, 3))
+        # fps is only readable at a few updates a second anyway
+        if pygame.time.get_ticks() - fps_text_ticks >= 200:
+            fps_text_ticks = pygame.time.get_ticks()
+            fps_text.setText(round(fps_value, 3))
 
         # draw sprites
         display_screen._redraw()
 
         # update display
         pygame.display.flip()
-        if not mugic_device.connected(): time.sleep(0.1)
+        # idle until the next datagram arrives instead of redrawing the same one
+        if not mugic_device.connected(): mugic_device.waitForDatagram(timeout=0.1)
+        elif not new_datagram: mugic_device.waitForDatagram(timeout=0.01)
 
 
 # MAIN FUNCTION - for use with testing / recording
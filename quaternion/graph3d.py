@@ -12,6 +12,21 @@ from quaternion.quat import Rotator, Point
 from pygame import draw
 # from setup3d import fill, line, show, DIMENSION
 
+# Matrix equivalent of p @ rot (rot * p * rot.conjugate()), so a whole shape
+# can be rotated with one matrix instead of two quaternion products per point
+def rotation_matrix(rot):
+    w, x, y, z = rot
+    ww, xx, yy, zz = w*w, x*x, y*y, z*z
+    return ((ww + xx - yy - zz, 2*(x*y - w*z), 2*(x*z + w*y)),
+            (2*(x*y + w*z), ww - xx + yy - zz, 2*(y*z - w*x)),
+            (2*(x*z - w*y), 2*(y*z + w*x), ww - xx - yy + zz))
+
+def _rotate(p, m):  # p is a Point, m a rotation_matrix
+    _, x, y, z = p
+    return (m[0][0]*x + m[0][1]*y + m[0][2]*z,
+            m[1][0]*x + m[1][1]*y + m[1][2]*z,
+            m[2][0]*x + m[2][1]*y + m[2][2]*z)
+
 class Line:
     def __init__(self, p0, p1, color, width=1):
         #assert p0.isvec() and p1.isvec()
@@ -57,6 +72,21 @@ class Line:
         #assert rot.isrot()
         return Line(self.start @ rot, self.end @ rot, self.color, self.width)
 
+    def rotate(self, m):  # m is a rotation_matrix
+        return Line(Point(*_rotate(self.start, m)), Point(*_rotate(self.end, m)),
+                    self.color, self.width)
+
+    def copy(self):
+        return Line(self.start.copy(), self.end.copy(), self.color, self.width)
+
+    def transform_into(self, out, by=None, m=None):  # (self * by).rotate(m) written into out
+        for p, q in ((self.start, out.start), (self.end, out.end)):
+            q[:] = p
+            if by is not None:
+                q[1:] = [a * b for a, b in zip(q[1:], by)]
+            if m is not None:
+                q[1:] = _rotate(q, m)
+
     def camera(self, rot, distance):  # rot is a rotation quaternion, distance is scalar
         #assert rot.isrot()
         gc.collect()
@@ -66,6 +96,13 @@ class Line:
         pe = Point(pe.x * distance, pe.y * distance, distance - pe.z)
         return Line(ps, pe, self.color, self.width)
 
+    def camera_matrix(self, m, distance):  # camera() using a rotation_matrix
+        xs, ys, zs = _rotate(self.start, m)
+        xe, ye, ze = _rotate(self.end, m)
+        ps = Point(xs * distance, ys * distance, distance - zs)
+        pe = Point(xe * distance, ye * distance, distance - ze)
+        return Line(ps, pe, self.color, self.width)
+
     def __str__(self):
         return 'start {} end {}'.format(self.start, self.end)
 
@@ -83,16 +120,21 @@ class Shape:
         return Shape([l * by for l in self.lines])
 
     def __matmul__(self, rot):
-        l = []
-        for line in self.lines:
-            l.append(line @ rot)
-        return Shape(l)
+        return self.rotate(rotation_matrix(rot))
+
+    def rotate(self, m):  # __matmul__ with a precomputed rotation_matrix
+        return Shape([line.rotate(m) for line in self.lines])
+
+    def copy(self):
+        return Shape([line.copy() for line in self.lines])
+
+    def transform_into(self, out, by=None, m=None):  # out is a copy() of this shape
+        for line, out_line in zip(self.lines, out.lines):
+            line.transform_into(out_line, by, m)
 
     def camera(self, rot, distance):
-        l = []
-        for line in self.lines:
-            l.append(line.camera(rot, distance))
-        return Shape(l)
+        m = rotation_matrix(rot)
+        return Shape([line.camera_matrix(m, distance) for line in self.lines])
 
     def show(self, surface):
         for line in self.lines:
@@ -228,6 +270,7 @@ class Camera:
         self.distance = distance
         self.crot = Rotator(1, 0, 0, 0)
         self.d = {}
+        self._updated = {}  # shapes owned by update(), reused between calls
 
     def __setitem__(self, key, value):
         if not isinstance(value, Shape):
@@ -240,6 +283,17 @@ class Camera:
     def __delitem__(self, key):
         del self.d[key]
 
+    # Sets key to (shape * by).rotate(m) without building a new Shape each call:
+    # the copy made the first time is kept and overwritten in place afterwards
+    def update(self, key, shape, by=None, m=None):  # by is a 3-tuple, m a rotation_matrix
+        if not isinstance(shape, Shape):
+            raise ValueError('Camera only accepts Shapes')
+        out = self._updated.get(key)
+        if out is None or self.d.get(key) is not out or len(out.lines) != len(shape.lines):
+            out = self._updated[key] = shape.copy()
+            self.d[key] = out
+        shape.transform_into(out, by, m)
+
     def show(self, surface, *shapes):
         dz = self.distance
         if shapes: